@@ -1,39 +1,141 @@
 import os
-import subprocess
-import zipfile
-import trimesh
-import tempfile
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import re
+import threading
+import uuid
 import numpy as np
-from tkinter import Tk, filedialog, Label, Entry, Button, OptionMenu, StringVar
 
 CURA_ENGINE_PATH = r"C:\Program Files\UltiMaker Cura 5.9.1\CuraEngine.exe"
 BASE_DEF = r"C:\Program Files\UltiMaker Cura 5.9.1\share\cura\resources\definitions\anycubic_kobra_max.def.json"
+GCODE_DIR = None  # Scratch dir for sliced G-code (e.g. a RAM disk); None picks /dev/shm or the temp dir
 
-def verify_mesh_for_openscad(mesh):
+CURA_GLOBAL_INI = """[general]
+version = 4
+name = {profile_name}
+definition = anycubic_kobra_max
+
+[metadata]
+type = quality_changes
+quality_type = pla
+intent_category = default
+setting_version = 24
+
+[values]
+"""
+
+CURA_EXTRUDER_INI = """[general]
+version = 4
+name = {profile_name}
+definition = anycubic_kobra_max
+
+[metadata]
+type = quality_changes
+quality_type = pla
+intent_category = default
+position = 0
+setting_version = 24
+
+[values]
+acceleration_print = 3000
+cool_min_layer_time = 0
+infill_sparse_density = 10
+infill_pattern = gyroid
+infill_overlap = 10
+jerk_print = 40
+speed_print = {max_speed}
+speed_wall_0 = {max_speed}
+speed_wall_x = {max_speed}
+wall_thickness = {thickness}
+print_thin_walls = True
+layer_height = 0.2
+top_thickness = 1.2
+support_enable = False
+"""
+
+OPENSCAD_CGAL_FEATURES = ("fast-csg",)
+
+CACHE_DIR_NAME = ".printfast_cache"
+PRINT_TIME_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "printfast", "times")
+PRINT_TIME_FORMAT = 2  # Bump when print-time parsing changes so earlier estimates are never reused
+GENERATED_STL_SUFFIXES = ("_raw_debug.stl", "_repaired_debug.stl")
+OPTIMIZED_STL_RE = re.compile(r"_opt_t[\d.]+_m\w+\.stl$", re.IGNORECASE)
+# Keep OpenSCAD/CuraEngine from flashing a console window per run on Windows (subprocess.CREATE_NO_WINDOW)
+SUBPROC_KW = {"creationflags": 0x08000000} if os.name == "nt" else {}
+
+# Above this many faces repair skips its second cleanup pass and the shell count
+REPAIR_MAX_FACES = 2_000_000
+
+STL_TRI_DTYPE = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+
+# Triangle vertices of a binary STL as an (n, 3, 3) float32 view; None for ASCII/malformed files
+def _read_binary_stl(path):
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < 84:
+                return None
+            n_tri = int.from_bytes(f.read(84)[80:84], "little")
+        if n_tri == 0 or size != 84 + n_tri * STL_TRI_DTYPE.itemsize:
+            return None
+        # The view stays backed by the mapped file, so nothing is copied onto the heap
+        return np.memmap(path, dtype=STL_TRI_DTYPE, mode="r", offset=84, shape=(n_tri,))["vertices"]
+    except (OSError, ValueError):
+        return None
+
+# Divergence theorem: sum of signed tetrahedron volumes against the origin
+# Upcast to float64 a block at a time so float32 views never need a full-size copy
+def _signed_volume(verts, block=1 << 16):
+    total = 0.0
+    for i in range(0, len(verts), block):
+        v = np.asarray(verts[i:i + block], dtype=np.float64)
+        total += np.einsum("ij,ij->i", v[:, 0], np.cross(v[:, 1], v[:, 2])).sum()
+    return total / 6
+
+# Bounds and volume straight from a binary STL; None for ASCII/malformed files
+# (watertightness is left to verify_mesh_for_openscad, which checks it on the loaded mesh anyway)
+def _fast_stl_stats(path):
+    verts = _read_binary_stl(path)
+    if verts is None:
+        return None
+
+    # Reduce over the strided view directly; reshape(-1, 3) would copy it
+    bounds = np.array([verts.min(axis=(0, 1)), verts.max(axis=(0, 1))])
+    return bounds, _signed_volume(verts)
+
+def verify_mesh_for_openscad(mesh, check_shells=True):
     if not mesh.is_watertight:
         return False, "Mesh is not watertight"
     if not mesh.is_winding_consistent:
         return False, "Mesh winding is inconsistent"
-    if len(mesh.split()) > 1:
+    if check_shells and mesh.body_count > 1:
         return False, "Mesh contains multiple shells"
     return True, "Mesh is valid for OpenSCAD"
 
-def repair_mesh(mesh):
+def repair_mesh(mesh, aggressive=True):
+    from trimesh import repair
+
     print("Starting mesh repair process...")
+    if not aggressive:
+        print(f"Warning: {len(mesh.faces)} faces—using a single cleanup pass, no per-shell normal fix and no shell check.")
     try:
+        # Vertices are already merged at 6 digits on load;
+        # process(validate=True) drops infinite values, degenerate and duplicate faces
         mesh.process(validate=True)
-        mesh.merge_vertices(digits_vertex=6)  # Higher precision
-        mesh.update_faces(mesh.nondegenerate_faces())
-        mesh.update_faces(mesh.unique_faces())
-        mesh.remove_infinite_values()
-        mesh.fix_normals()
 
         if not mesh.is_watertight:
             print("Basic repair failed—attempting hole filling...")
-            mesh.fill_holes()
-            mesh.process(validate=True)
-
-        is_valid, message = verify_mesh_for_openscad(mesh)
+            repair.fill_holes(mesh)
+            if aggressive:
+                mesh.process(validate=True)  # fill_holes can add duplicate faces
+        # Per-body winding/inversion fix; Trimesh.fix_normals would first count bodies to decide this.
+        # Huge meshes skip it, since splitting into bodies builds the connected components again
+        repair.fix_normals(mesh, multibody=aggressive)
+
+        is_valid, message = verify_mesh_for_openscad(mesh, check_shells=aggressive)
         if is_valid:
             print("Mesh repair successful: Ready for OpenSCAD")
         else:
@@ -48,43 +150,137 @@ def repair_mesh(mesh):
         print(f"Error during repair: {e}")
         return None
 
-def optimize_stl(input_path, thickness=0.2, max_speed=150, mode="fast", output_dir=""):
-    # Load STL
+# Outputs are written next to their final path and os.replace'd in, so a crash never leaves a partial file.
+# The PID keeps batch workers apart; the extension is kept because trimesh/OpenSCAD pick the format from it.
+def _tmp_path(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.tmp{ext}"
+
+def manifold_available():
+    return importlib.util.find_spec("manifold3d") is not None
+
+def hollow_with_manifold(mesh, output_path, inner_scale, dims, center, scale_factor):
+    import trimesh
+
+    print("Hollowing with Manifold...")
     try:
-        raw_mesh = trimesh.load(input_path)
-        print(f"Raw Mesh Stats: Vertices={len(raw_mesh.vertices)}, Faces={len(raw_mesh.faces)}")
+        outer = mesh.copy()
+        if scale_factor != 1:
+            outer.apply_scale(scale_factor)
+        outer.apply_translation(-center)
+        inner = outer.copy()
+        inner.apply_scale(inner_scale)
+
+        # Bottom cut, same slab as the OpenSCAD script but at the centered model's base
+        cut = trimesh.creation.box(
+            extents=[dims[0] + 0.1, dims[1] + 0.1, 0.02],
+            transform=trimesh.transformations.translation_matrix([0, 0, -dims[2] / 2 - 0.001]))
+
+        hollow = trimesh.boolean.difference([outer, inner, cut], engine="manifold")
+        tmp_path = _tmp_path(output_path)
+        try:
+            hollow.export(tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        print(f"Exported STL: {output_path}")
+        return output_path
     except Exception as e:
-        print(f"Error loading STL: {e}")
-        return False
+        print(f"Error: Manifold hollowing failed—{e}")
+        return None
 
-    # Test raw mesh in OpenSCAD first
-    debug_path = input_path.replace(".stl", "_raw_debug.stl")
-    raw_mesh.export(debug_path, file_type='stl_ascii')
+# OpenSCAD can't serve several jobs from one process, so instead probe its options once per
+# process and use the Manifold backend (much faster than CGAL) when this build has it
+@functools.lru_cache(maxsize=None)
+def _openscad_help(openscad_path):
+    import subprocess
 
-    # Attempt repair if raw fails
-    mesh = repair_mesh(raw_mesh)
-    if mesh is None:
-        print("Repair failed—using raw mesh...")
-        mesh = raw_mesh
-    else:
-        repaired_path = input_path.replace(".stl", "_repaired_debug.stl")
-        mesh.export(repaired_path, file_type='stl_ascii')
-        input_path = repaired_path
-
-    is_valid, message = verify_mesh_for_openscad(mesh)
-    if not is_valid:
-        print(f"Warning: {message}—proceeding with raw mesh if possible.")
-
-    # Process mesh
-    bounds = mesh.bounds
-    dims = [bounds[1][0] - bounds[0][0], bounds[1][1] - bounds[0][1], bounds[1][2] - bounds[0][2]]
-    center = [(bounds[0][0] + bounds[1][0]) / 2, (bounds[0][1] + bounds[1][1]) / 2, (bounds[0][2] + bounds[1][2]) / 2]
-    
-    scale_factor = 1000 if max(dims) < 1 else 1
+    try:
+        result = subprocess.run([openscad_path, "--help"], stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                                timeout=30, **SUBPROC_KW)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout + result.stderr
+
+def _openscad_flags(openscad_path):
+    help_text = _openscad_help(openscad_path)
+    if "--backend" in help_text and "Manifold" in help_text:
+        return ["--backend=Manifold"]
+    if "manifold" in help_text:  # Older nightlies: experimental feature
+        return ["--enable=manifold"]
+    # CGAL-only builds: fast-csg replaces Nef polyhedron booleans with corefinement where it can
+    return [f"--enable={feature}" for feature in OPENSCAD_CGAL_FEATURES if feature in help_text]
+
+def hollow_with_openscad(mesh, output_path, inner_scale, dims, center, scale_factor):
+    import subprocess
+    import tempfile
+
+    # Center (and scale) the mesh once in NumPy so the script imports it as-is
+    centered = mesh.copy()
+    if scale_factor != 1:
+        centered.apply_scale(scale_factor)
+    centered.apply_translation(-center)
+    # The scratch dir goes away on every exit path, including a failed export
+    with tempfile.TemporaryDirectory(prefix="printfast_") as work_dir:
+        centered_path = os.path.join(work_dir, "centered.stl")
+        try:
+            centered.export(centered_path)
+        except OSError as e:
+            print(f"Error: OpenSCAD hollowing failed—could not write {centered_path}: {e}")
+            return None
+
+        # Simplified OpenSCAD script (absolute import path, since stdin scripts resolve against the cwd)
+        import_path = centered_path.replace("\\", "/")
+        inner_matrix = json.dumps(np.diag([*inner_scale, 1.0]).tolist())  # inner copy as one affine node
+        scad_script = f"""
+        // render() caches the imported geometry, so both uses below share one evaluation
+        module model() {{
+            render() import("{import_path}");
+        }}
+
+        // Hollowed model with bottom cut
+        difference() {{
+            model();
+            multmatrix({inner_matrix})
+                model();
+            translate([0, 0, {-dims[2] / 2 - 0.001}])
+                cube([{dims[0] + 0.1}, {dims[1] + 0.1}, 0.02], center=true);
+        }}
+        """
+        # Run OpenSCAD, feeding the script on stdin
+        openscad_path = "openscad"
+        tmp_path = _tmp_path(output_path)
+        try:
+            cmd = [openscad_path, *_openscad_flags(openscad_path), "-o", tmp_path, "-"]
+            result = subprocess.run(cmd, input=scad_script, capture_output=True, text=True, check=True, timeout=600, **SUBPROC_KW)
+            os.replace(tmp_path, output_path)
+            print(f"OpenSCAD Output:\n{result.stdout}")
+            print(f"Exported STL: {output_path}")
+        except subprocess.CalledProcessError as e:
+            print(f"Error: OpenSCAD failed—Output:\n{e.stdout}\nError:\n{e.stderr}")
+            output_path = None
+        except subprocess.TimeoutExpired:
+            print("Error: OpenSCAD timed out after 10 minutes.")
+            output_path = None
+        except FileNotFoundError:
+            print(f"Error: OpenSCAD not found ({openscad_path})")
+            output_path = None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return output_path
+
+def fit_model(bounds, thickness):
+    bounds = np.array(bounds, dtype=np.float64)
+    dims = bounds[1] - bounds[0]
+    center = bounds.mean(axis=0)
+
+    scale_factor = 1000 if dims.max() < 1 else 1
     if scale_factor != 1:
-        dims = [d * scale_factor for d in dims]
-        center = [c * scale_factor for c in center]
-        bounds = [[b * scale_factor for b in bounds[0]], [b * scale_factor for b in bounds[1]]]
+        bounds *= scale_factor
+        dims *= scale_factor
+        center *= scale_factor
         print(f"Scaled model by {scale_factor}x—assuming input was in meters.")
     
     print(f"Actual Dimensions: X={dims[0]:.2f}, Y={dims[1]:.2f}, Z={dims[2]:.2f} mm")
@@ -92,7 +288,7 @@ def optimize_stl(input_path, thickness=0.2, max_speed=150, mode="fast", output_d
     print(f"Bounds: Min={bounds[0]}, Max={bounds[1]}")
 
     # Adjust thickness
-    min_dim = min(dims)
+    min_dim = dims.min()
     if thickness * 2 > min_dim:
         thickness = min_dim / 4
         print(f"Adjusted thickness to {thickness:.2f} mm to fit model (min dim: {min_dim:.2f} mm).")
@@ -102,186 +298,444 @@ def optimize_stl(input_path, thickness=0.2, max_speed=150, mode="fast", output_d
 
     if min_dim - 2 * thickness < 0.4:
         print(f"Error: Model too thin (min dim - 2*thickness = {min_dim - 2*thickness:.2f} mm) for hollowing.")
-        return False
+        return None
 
-    # Simplified OpenSCAD script
-    scad_script = f"""
-    module model() {{
-        translate([{-center[0]}, {-center[1]}, {-center[2]}])
-        import("{input_path.replace('\\', '/')}"); 
-    }}
-
-    // Hollowed model with bottom cut
-    difference() {{
-        model();
-        scale([{(dims[0] - 2*thickness)/dims[0]}, {(dims[1] - 2*thickness)/dims[1]}, {(dims[2] - 2*thickness)/dims[2]}])
-            model();
-        translate([0, 0, {bounds[0][2] - 0.001}])
-            cube([{dims[0] + 0.1}, {dims[1] + 0.1}, 0.02], center=true);
-    }}
-    """
-    scad_path = os.path.join(output_dir, "temp.scad")
-    with open(scad_path, "w") as f:
-        f.write(scad_script)
-
-    # Run OpenSCAD
-    output_path = os.path.join(output_dir, os.path.basename(input_path).replace(".stl", f"_opt_t{thickness}_m{mode}.stl"))
-    openscad_path = "openscad"
+    return bounds, dims, center, scale_factor, thickness
+
+@functools.lru_cache(maxsize=32)
+def _cura_profile_bytes(profile_name, max_speed, thickness):
+    import zipfile
+
+    values = {"profile_name": profile_name, "max_speed": max_speed, "thickness": thickness}
+    buf = io.BytesIO()
+    # Entries are ~500 bytes; deflate costs more than it saves, and Cura reads stored entries fine
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        # Fixed entry timestamps keep the bytes identical across runs, so print-time cache keys stay stable
+        for name, template in (("anycubic_kobra_max_test", CURA_GLOBAL_INI),
+                               ("anycubic_kobra_max_extruder_0_#2_test", CURA_EXTRUDER_INI)):
+            zf.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), template.format_map(values))
+    return buf.getvalue()
+
+def _write_cura_profile(profile_path, profile_name, max_speed, thickness):
+    tmp_path = _tmp_path(profile_path)
     try:
-        result = subprocess.run([openscad_path, "-o", output_path, scad_path], capture_output=True, text=True, check=True, timeout=600)
-        print(f"OpenSCAD Output:\n{result.stdout}")
-        os.remove(scad_path)
-        print(f"Exported STL: {output_path}")
+        with open(tmp_path, "wb") as f:
+            f.write(_cura_profile_bytes(profile_name, max_speed, thickness))
+        os.replace(tmp_path, profile_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# The header's ";TIME:" is written before slicing and only holds a placeholder (6666);
+# the last ";TIME_ELAPSED:<seconds>" near the end of the G-code is the real total
+def _read_gcode_time(gcode_path, chunk_size=8192):
+    with open(gcode_path, "rb") as g:
+        g.seek(0, os.SEEK_END)
+        g.seek(max(0, g.tell() - chunk_size))
+        tail = g.read()
+    idx = tail.rfind(b";TIME_ELAPSED:")
+    if idx == -1:
+        return None
+    end = tail.find(b"\n", idx)
+    return float(tail[idx + 14:end if end != -1 else None])
+
+def _file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _print_time_key(stl_path, profile_path):
+    cura_stamp = "-".join(str(os.stat(path).st_mtime_ns) for path in (CURA_ENGINE_PATH, BASE_DEF))
+    return f"v{PRINT_TIME_FORMAT}-{_file_digest(stl_path)}-{_file_digest(profile_path)}-{cura_stamp}"
+
+def _load_print_time(key):
+    try:
+        with open(os.path.join(PRINT_TIME_CACHE, f"{key}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# One file per key: batch workers are separate processes, and a shared file would drop their concurrent writes
+def _store_print_time(key, minutes):
+    path = os.path.join(PRINT_TIME_CACHE, f"{key}.json")
+    os.makedirs(PRINT_TIME_CACHE, exist_ok=True)
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "w") as f:
+        json.dump(minutes, f)
+    os.replace(tmp_path, path)
+
+# Only a few KB of the G-code are read back, so keep it in RAM where the OS allows it
+def _gcode_dir():
+    import tempfile
+
+    if GCODE_DIR:
+        return GCODE_DIR
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def get_print_time(stl_path, profile_path, label):
+    import subprocess
+    import tempfile
+
+    if not os.path.exists(CURA_ENGINE_PATH):
+        print(f"Error: CuraEngine not found at {CURA_ENGINE_PATH}")
+        return None
+    if not os.path.exists(BASE_DEF):
+        print(f"Error: Base definition file not found at {BASE_DEF}")
+        return None
+    
+    # Identical STL + profile + Cura install always slices to the same time
+    cache_key = _print_time_key(stl_path, profile_path)
+    cached = _load_print_time(cache_key)
+    if cached is not None:
+        print(f"Using cached print time for {label}")
+        return cached
+
+    temp_gcode = os.path.join(_gcode_dir(), f"temp_{label}_{uuid.uuid4().hex}.gcode")
+    cmd = [
+        CURA_ENGINE_PATH, "slice",
+        "-j", BASE_DEF,
+        "-s", "print_sequence=one_at_a_time",
+        "-l", os.path.abspath(stl_path),
+        "-o", temp_gcode,
+        "-e0", f"load={os.path.abspath(profile_path)}"
+    ]
+    try:
+        subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+                       cwd=tempfile.gettempdir(), timeout=600, **SUBPROC_KW)
+        time_sec = _read_gcode_time(temp_gcode)
     except subprocess.CalledProcessError as e:
-        print(f"Error: OpenSCAD failed—Output:\n{e.stdout}\nError:\n{e.stderr}")
-        os.remove(scad_path)
-        output_path = None
+        print(f"Error slicing {label}: CuraEngine exited with code {e.returncode}")
+        return None
     except subprocess.TimeoutExpired:
-        print("Error: OpenSCAD timed out after 10 minutes.")
-        os.remove(scad_path)
-        output_path = None
+        print(f"Error slicing {label}: CuraEngine timed out after 10 minutes.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading G-code for {label}: {e}")
+        return None
+    finally:
+        if os.path.exists(temp_gcode):
+            os.remove(temp_gcode)
+
+    if time_sec is None:
+        print(f"Error: Print time not found in G-code for {label}")
+        return None
+    try:
+        _store_print_time(cache_key, time_sec / 60)
+    except OSError as e:
+        print(f"Warning: Could not write print time cache: {e}")
+    return time_sec / 60
+
+def _cache_key(path, thickness, mode, max_speed, engine, output_dir, verify):
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{thickness}|{mode}|{max_speed}|{engine}|{os.path.abspath(output_dir)}|{verify}".encode())
+    return h.hexdigest()
+
+def _load_cached_result(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(result.get(k) and os.path.exists(result[k]) for k in ("output_path", "profile_path")):
+        return None
+    # Other engines/settings write the same output name, so the STL must still be the one this run produced
+    try:
+        if _file_digest(result["output_path"]) != result.get("output_digest"):
+            return None
+    except OSError:
+        return None
+    return result
+
+def _save_cached_result(manifest_path, result):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = _tmp_path(manifest_path)
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, manifest_path)
+
+def print_summary(result):
+    opt_time, unopt_time = result["opt_time"], result["unopt_time"]
+    if opt_time is not None:
+        print(f"Optimized Print Time: {opt_time:.2f} minutes")
+    if unopt_time is not None:
+        print(f"Unoptimized Print Time: {unopt_time:.2f} minutes")
+    if opt_time and unopt_time:
+        print(f"Time Saved: {unopt_time - opt_time:.2f} minutes ({(unopt_time - opt_time) / unopt_time * 100:.1f}%)")
+
+    output_name = os.path.basename(result["output_path"]) if result["output_path"] else os.path.basename(result["input_path"])
+    print(f"Instructions: Load '{output_name}' into Cura, import '{os.path.basename(result['profile_path'])}' to verify.")
+
+def optimize_stl(input_path, thickness=0.2, max_speed=150, mode="fast", output_dir="", engine="manifold", verify=False):
+    # Reuse a previous run with the same input file and settings
+    try:
+        cache_key = _cache_key(input_path, thickness, mode, max_speed, engine, output_dir, verify)
+    except OSError as e:
+        print(f"Error loading STL: {e}")
+        return False
+    manifest_path = os.path.join(os.path.dirname(os.path.abspath(input_path)), CACHE_DIR_NAME, f"{cache_key}.json")
+    cached = _load_cached_result(manifest_path)
+    if cached is not None:
+        print(f"Using cached results ({manifest_path})")
+        print(f"Exported STL: {cached['output_path']}")
+        print(f"Thickness {cached['thickness']}: Original Volume: {cached['orig_volume']:.2f} mm³")
+        if cached["opt_volume"] is not None:
+            label = "Optimized Volume" if cached["opt_volume_measured"] else "Estimated Optimized Volume"
+            print(f"{label}: {cached['opt_volume']:.2f} mm³")
+        # The profile name leaves out max_speed, so another run may have overwritten it since
+        profile_name = os.path.splitext(os.path.basename(cached["profile_path"]))[0]
+        _write_cura_profile(cached["profile_path"], profile_name, max_speed, cached["thickness"])
+        print(f"Exported Cura Profile: {cached['profile_path']}")
+        print_summary(cached)
+        return True
+
+    # Binary STLs can be sized up before the full trimesh load, to reject too-thin models early
+    stats = _fast_stl_stats(input_path)
+    if stats is not None:
+        print(f"Raw STL Stats: Volume={stats[1]:.2f}")
+        fit = fit_model(stats[0], thickness)
+        if fit is None:
+            return False
+
+    # Load STL (trimesh is imported lazily; it is by far the slowest import)
+    import trimesh
+    try:
+        # Read triangles as-is and merge once at repair precision; trimesh.load would merge at its own
+        # tolerance first and repair_mesh would redo it
+        with open(input_path, "rb") as f:
+            raw_mesh = trimesh.Trimesh(**trimesh.exchange.stl.load_stl(f), process=False)
+        if len(raw_mesh.faces) == 0:
+            raise ValueError("no triangles found")
+        raw_mesh.merge_vertices(digits_vertex=6)
+        print(f"Raw Mesh Stats: Vertices={len(raw_mesh.vertices)}, Faces={len(raw_mesh.faces)}")
+    except Exception as e:
+        print(f"Error loading STL: {e}")
+        return False
+
+    # Attempt repair if raw fails; clean, outward-facing meshes go straight to hollowing
+    # mesh.volume would also compute the inertia tensor, so volumes go through _signed_volume
+    aggressive = len(raw_mesh.faces) <= REPAIR_MAX_FACES
+    is_valid, message = verify_mesh_for_openscad(raw_mesh, check_shells=aggressive)
+    volume = None
+    if is_valid:
+        # Closed mesh, so the volume from the binary STL pass is exact
+        volume = stats[1] if stats is not None else _signed_volume(raw_mesh.triangles)
+    refit = stats is None
+    if is_valid and volume > 0:
+        print("Raw mesh is valid—skipping repair.")
+        mesh = raw_mesh
+    else:
+        volume = None  # repair can flip normals
+        refit = True  # and drop degenerate/stray faces that widened the raw bounds
+        mesh = repair_mesh(raw_mesh, aggressive)
+        if mesh is None:
+            print("Repair failed—using raw mesh...")
+            mesh = raw_mesh
+            # repair_mesh verifies its own result, so only the fallback needs checking here
+            is_valid, message = verify_mesh_for_openscad(mesh, check_shells=aggressive)
+            if not is_valid:
+                print(f"Warning: {message}—proceeding with raw mesh if possible.")
+
+    if refit:
+        v = mesh.vertices
+        fit = fit_model(np.array([v.min(axis=0), v.max(axis=0)]), thickness)
+        if fit is None:
+            return False
+    bounds, dims, center, scale_factor, thickness = fit
+    inner_scale = (dims - 2 * thickness) / dims  # per-axis scale of the inner (removed) copy
+
+    # Hollow model
+    stem = os.path.basename(os.path.splitext(input_path)[0])
+    output_path = os.path.join(output_dir, f"{stem}_opt_t{thickness}_m{mode}.stl")
+    if engine == "manifold" and not manifold_available():
+        print("Warning: manifold3d not installed—falling back to OpenSCAD.")
+        engine = "openscad"
+    if engine == "manifold":
+        output_path = hollow_with_manifold(mesh, output_path, inner_scale, dims, center, scale_factor)
+    else:
+        output_path = hollow_with_openscad(mesh, output_path, inner_scale, dims, center, scale_factor)
 
     # Volume check
-    orig_volume = mesh.volume * (scale_factor ** 3)
-    opt_volume = trimesh.load(output_path).volume if output_path and os.path.exists(output_path) else None
+    if volume is None:
+        volume = _signed_volume(mesh.triangles)
+    orig_volume = volume * (scale_factor ** 3)
+    opt_volume = None
+    if output_path and os.path.exists(output_path):
+        if verify:
+            verts = _read_binary_stl(output_path)
+            if verts is not None:
+                opt_volume = _signed_volume(verts)
+            else:
+                opt_volume = trimesh.load(output_path, process=False, force="mesh").volume
+        else:
+            # The inner shell is the model scaled per axis, so its volume scales by the same factors
+            opt_volume = orig_volume * (1 - inner_scale.prod())
     print(f"Thickness {thickness}: Original Volume: {orig_volume:.2f} mm³")
     if opt_volume is not None:
-        print(f"Optimized Volume: {opt_volume:.2f} mm³")
+        print(f"{'Optimized Volume' if verify else 'Estimated Optimized Volume'}: {opt_volume:.2f} mm³")
     print(f"Final Height: {dims[2]:.2f} mm")
 
-    if max(dims) < 10:
+    if dims.max() < 10:
         print(f"Warning: Model dimensions {dims[0]:.2f}x{dims[1]:.2f}x{dims[2]:.2f} mm are small—scale in Cura if needed.")
 
     # Cura profile
     profile_name = f"PrintFast_{mode}_t{thickness}"
-    global_ini = f"""[general]
-version = 4
-name = {profile_name}
-definition = anycubic_kobra_max
-
-[metadata]
-type = quality_changes
-quality_type = pla
-intent_category = default
-setting_version = 24
-
-[values]
-"""
-
-    extruder_ini = f"""[general]
-version = 4
-name = {profile_name}
-definition = anycubic_kobra_max
-
-[metadata]
-type = quality_changes
-quality_type = pla
-intent_category = default
-position = 0
-setting_version = 24
-
-[values]
-acceleration_print = 3000
-cool_min_layer_time = 0
-infill_sparse_density = 10
-infill_pattern = gyroid
-infill_overlap = 10
-jerk_print = 40
-speed_print = {max_speed}
-speed_wall_0 = {max_speed}
-speed_wall_x = {max_speed}
-wall_thickness = {thickness}
-print_thin_walls = True
-layer_height = 0.2
-top_thickness = 1.2
-support_enable = False
-"""
-
     profile_path = os.path.join(output_dir, f"{profile_name}.curaprofile")
-    with zipfile.ZipFile(profile_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("anycubic_kobra_max_test", global_ini)
-        zf.writestr("anycubic_kobra_max_extruder_0_#2_test", extruder_ini)
+    _write_cura_profile(profile_path, profile_name, max_speed, thickness)
     print(f"Exported Cura Profile: {profile_path}")
 
-    # Slice with CuraEngine
-    def get_print_time(stl_path, profile_path, label):
-        if not os.path.exists(CURA_ENGINE_PATH):
-            print(f"Error: CuraEngine not found at {CURA_ENGINE_PATH}")
-            return None
-        if not os.path.exists(BASE_DEF):
-            print(f"Error: Base definition file not found at {BASE_DEF}")
-            return None
-        
-        temp_gcode = os.path.join(tempfile.gettempdir(), f"temp_{label}.gcode")
-        cmd = [
-            CURA_ENGINE_PATH, "slice", "-v",
-            "-j", BASE_DEF,
-            "-s", "print_sequence=one_at_a_time",
-            "-l", stl_path,
-            "-o", temp_gcode,
-            "-e0", f"load={profile_path}"
-        ]
+    # Slice with CuraEngine, both runs side by side
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_opt = ex.submit(get_print_time, output_path, profile_path, "optimized") if output_path else None
+        fut_unopt = ex.submit(get_print_time, input_path, profile_path, "unoptimized")  # The untouched input
+        opt_time = fut_opt.result() if fut_opt else None
+        unopt_time = fut_unopt.result()
+
+    result = {
+        "output_path": os.path.abspath(output_path) if output_path else None,
+        "input_path": os.path.abspath(input_path),
+        "profile_path": os.path.abspath(profile_path),
+        "thickness": thickness,
+        "orig_volume": float(orig_volume),
+        "opt_volume": float(opt_volume) if opt_volume is not None else None,
+        "opt_volume_measured": verify,
+        "opt_time": opt_time,
+        "unopt_time": unopt_time,
+    }
+    # Only complete runs are reused; a failed slice should be retried next time
+    if output_path and opt_time is not None and unopt_time is not None:
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"CuraEngine Output for {label}:\n{result.stdout[:500]}...")  # Truncate for brevity
-            for line in result.stdout.splitlines():
-                if ";TIME:" in line:
-                    time_sec = int(line.split(":")[1])
-                    os.remove(temp_gcode)
-                    return time_sec / 60
-            print(f"Error: Print time not found in CuraEngine output for {label}")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error slicing {label}: {e.stderr}")
-            return None
+            result["output_digest"] = _file_digest(output_path)
+            _save_cached_result(manifest_path, result)
+        except OSError as e:
+            print(f"Warning: Could not write cache manifest: {e}")
 
-    opt_time = get_print_time(output_path, profile_path, "optimized") if output_path else None
-    unopt_time = get_print_time(debug_path, profile_path, "unoptimized")  # Use raw debug STL
-    
-    if opt_time is not None:
-        print(f"Optimized Print Time: {opt_time:.2f} minutes")
-    if unopt_time is not None:
-        print(f"Unoptimized Print Time: {unopt_time:.2f} minutes")
-    if opt_time and unopt_time:
-        print(f"Time Saved: {unopt_time - opt_time:.2f} minutes ({(unopt_time - opt_time) / unopt_time * 100:.1f}%)")
-
-    print(f"Instructions: Load '{os.path.basename(output_path) if output_path else debug_path}' into Cura, import '{os.path.basename(profile_path)}' to verify.")
+    print_summary(result)
     return True
 
-# GUI (unchanged)
+def find_stl_files(folder):
+    # Skip the optimized STLs (and debug STLs from older versions) left next to the inputs
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.lower().endswith(".stl") and not name.lower().endswith(GENERATED_STL_SUFFIXES)
+            and not OPTIMIZED_STL_RE.search(name)]
+
+def _optimize_job(job):
+    # An exception would re-raise out of imap_unordered and abort the whole batch
+    try:
+        return job[0], optimize_stl(*job)
+    except Exception as e:
+        print(f"Error optimizing {job[0]}: {e}")
+        return job[0], False
+
+def optimize_batch(paths, thickness=0.2, max_speed=150, mode="fast", output_dir="", engine="manifold", verify=False,
+                   progress=None):
+    import multiprocessing
+
+    jobs = [(path, thickness, max_speed, mode, output_dir, engine, verify) for path in paths]
+    results = {}
+    if not jobs:
+        return results
+    # Each worker runs its own hollowing and CuraEngine processes
+    workers = max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    with multiprocessing.Pool(workers) as pool:
+        for path, ok in pool.imap_unordered(_optimize_job, jobs):
+            results[path] = ok
+            if progress is not None:
+                progress(len(results), len(jobs), path, ok)
+    return results
+
+# GUI: single file or folder batch; batches run on a worker thread and report through progress_queue
 def run_gui():
+    import queue
+    from tkinter import Tk, filedialog, Label, Entry, Button, Checkbutton, OptionMenu, BooleanVar, StringVar
+
     root = Tk()
     root.title("PrintFast STL Optimizer (OpenSCAD + Cura)")
-    root.geometry("400x300")
+    root.geometry("400x450")
 
     Label(root, text="Optimize Your 3D Print!", font=("Arial", 14)).pack(pady=10)
 
     stl_path = StringVar()
     Label(root, text="Select STL File:").pack()
     Button(root, text="Browse", command=lambda: stl_path.set(filedialog.askopenfilename(filetypes=[("STL Files", "*.stl")]))).pack()
+    Button(root, text="Browse Folder", command=lambda: stl_path.set(filedialog.askdirectory())).pack()
     Entry(root, textvariable=stl_path, width=40).pack()
 
     speed_var = StringVar(value="150")
     Label(root, text="Printer Max Speed (mm/s):").pack()
     Entry(root, textvariable=speed_var, width=10).pack()
 
+    # Validate as the user types and keep the last good value, so clicks never re-parse
+    max_speed = [150]
+    def update_speed(*_):
+        try:
+            max_speed[0] = int(speed_var.get())
+        except ValueError:
+            pass
+    speed_var.trace_add("write", update_speed)
+
     mode_var = StringVar(value="fast")
     Label(root, text="Mode:").pack()
     OptionMenu(root, mode_var, "fast", "balanced").pack()
 
+    thickness = [0.2]
+    def update_mode(*_):
+        thickness[0] = 0.2 if mode_var.get() == "fast" else 0.8
+    mode_var.trace_add("write", update_mode)
+
+    engine_var = StringVar(value="manifold")
+    Label(root, text="Engine:").pack()
+    OptionMenu(root, engine_var, "manifold", "openscad").pack()
+
+    # Off by default: the optimized volume is then estimated from the wall scale instead of measured
+    verify_var = BooleanVar(value=False)
+    Checkbutton(root, text="Measure optimized volume (slower)", variable=verify_var).pack()
+
+    status_var = StringVar()
+    progress_queue = queue.Queue()
+
+    # Batch progress arrives from a worker thread; only the Tk thread touches widgets
+    def poll_progress():
+        while not progress_queue.empty():
+            status_var.set(progress_queue.get_nowait())
+        root.after(100, poll_progress)
+
+    def run_batch(paths, thickness, max_speed, mode, output_dir, engine, verify):
+        def progress(done, total, path, ok):
+            progress_queue.put(f"{done}/{total}: {os.path.basename(path)} {'done' if ok else 'failed'}")
+        try:
+            results = optimize_batch(paths, thickness, max_speed, mode, output_dir, engine, verify, progress)
+        except Exception as e:
+            print(f"Error: Batch optimization failed: {e}")
+            progress_queue.put(f"Batch failed: {e}")
+            return
+        progress_queue.put(f"Batch complete: {sum(results.values())}/{len(results)} optimized")
+
     def optimize():
         input_path = stl_path.get()
         if not input_path:
             print("Error: No STL file selected!")
             return
-        max_speed = int(speed_var.get())
         mode = mode_var.get()
-        thickness = 0.2 if mode == "fast" else 0.8
+        if os.path.isdir(input_path):
+            paths = find_stl_files(input_path)
+            status_var.set(f"Optimizing {len(paths)} STL files...")
+            threading.Thread(target=run_batch, args=(paths, thickness[0], max_speed[0], mode, input_path, engine_var.get(),
+                                                         verify_var.get()), daemon=True).start()
+            return
         output_dir = os.path.dirname(input_path)
-        if optimize_stl(input_path, thickness, max_speed, mode, output_dir):
+        if optimize_stl(input_path, thickness[0], max_speed[0], mode, output_dir, engine_var.get(), verify_var.get()):
             print("Optimization complete! Check output files in", output_dir)
 
     Button(root, text="Optimize!", command=optimize, bg="green", fg="white", font=("Arial", 12)).pack(pady=20)
+    Label(root, textvariable=status_var).pack()
+
+    poll_progress()
 
     root.mainloop()
 